@@ -14,46 +14,15 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from scripts.oracles_client import OraclesClient
 from scripts.forecast_reporter import ForecastReporter
+from scripts.feature_store import FeatureStore, MARKET_LIMIT
 
-def main():
-    print(f"\n{'='*70}")
-    print(f"🔮 ORACLE CLAWBOT - FORECAST RUN")
-    print(f"Time: {datetime.now().isoformat()}")
-    print(f"{'='*70}")
-    
-    # Load environment
-    from dotenv import load_dotenv
-    load_dotenv()
-    
-    agent_id = os.getenv("ORACLES_AGENT_ID")
-    api_key = os.getenv("ORACLES_API_KEY")
-    
-    if not agent_id or not api_key:
-        print("❌ ERROR: ORACLES_AGENT_ID and ORACLES_API_KEY required in .env")
-        sys.exit(1)
-    
-    # Initialize clients
-    print("\n📡 Connecting to oracles.run...")
-    oracles = OraclesClient(agent_id, api_key)
-    
-    # Load Twitter token
-    try:
-        with open('.twitter_oauth2_tokens.json') as f:
-            tokens = json.load(f)
-        twitter_token = tokens['access_token']
-        print("✅ Twitter token loaded")
-    except Exception as e:
-        print(f"❌ Twitter token error: {e}")
-        print("   Run: python3 scripts/get_url.py")
-        sys.exit(1)
-    
-    reporter = ForecastReporter(oracles, twitter_token)
-    
-    # Fetch available markets
-    print("\n📊 Fetching open markets...")
-    markets = oracles.list_markets(status="open")
-    print(f"✅ Found {len(markets)} open markets")
-    
+def build_forecasts(markets, features=None):
+    """Build the forecast batch for a list of markets
+
+    features is FeatureStore.get_many() output, keyed by (slug, outcome).
+    Also used by scripts/backtester.py to replay stored snapshots offline,
+    so keep this free of network calls and side effects.
+    """
     # =========================================================================
     # DEFINE YOUR FORECASTS HERE
     # Update this section with your analysis for each run
@@ -107,6 +76,62 @@ def main():
     
     # =========================================================================
     
+    # Append cached market context to each rationale
+    for fc in forecasts:
+        context = (features or {}).get((fc['market_slug'], fc['outcome']), {}).get('rationale_text')
+        if context:
+            fc['rationale'] = f"{fc['rationale']} {context}"
+    
+    return forecasts
+
+def main():
+    print(f"\n{'='*70}")
+    print(f"🔮 ORACLE CLAWBOT - FORECAST RUN")
+    print(f"Time: {datetime.now().isoformat()}")
+    print(f"{'='*70}")
+    
+    # Load environment
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    agent_id = os.getenv("ORACLES_AGENT_ID")
+    api_key = os.getenv("ORACLES_API_KEY")
+    
+    if not agent_id or not api_key:
+        print("❌ ERROR: ORACLES_AGENT_ID and ORACLES_API_KEY required in .env")
+        sys.exit(1)
+    
+    # Initialize clients
+    print("\n📡 Connecting to oracles.run...")
+    oracles = OraclesClient(agent_id, api_key)
+    
+    # Load Twitter token
+    try:
+        with open('.twitter_oauth2_tokens.json') as f:
+            tokens = json.load(f)
+        twitter_token = tokens['access_token']
+        print("✅ Twitter token loaded")
+    except Exception as e:
+        print(f"❌ Twitter token error: {e}")
+        print("   Run: python3 scripts/get_url.py")
+        sys.exit(1)
+    
+    reporter = ForecastReporter(oracles, twitter_token)
+    
+    # Fetch available markets
+    print("\n📊 Fetching open markets...")
+    markets = oracles.list_markets(status="open", limit=MARKET_LIMIT)
+    print(f"✅ Found {len(markets)} open markets")
+    
+    # Cached per-market features (only recomputed for markets that changed)
+    store = FeatureStore()
+    # Only a short page is the whole listing; a full one may be cut off
+    features = store.get_many(markets, complete=len(markets) < MARKET_LIMIT)
+    print(f"✅ Features: {store.stats['computed']} computed, "
+          f"{store.stats['memory_hits'] + store.stats['disk_hits']} cached")
+    
+    forecasts = build_forecasts(markets, features=features)
+    
     if not forecasts:
         print("\n⚠️ No forecasts defined. Edit this script to add forecasts.")
         sys.exit(0)
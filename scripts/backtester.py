@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Oracle ClawBot - Offline Backtester
+Replays stored market snapshots + resolved outcomes through a forecast
+strategy and scores it (Brier, stake-weighted return, calibration)
+"""
+
+import os
+import sys
+import json
+import glob
+import argparse
+import inspect
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from feature_store import FeatureStore
+
+# Repo root on path so strategies like run_forecast:build_forecasts import
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+DEFAULT_STRATEGY = "run_forecast:build_forecasts"
+CALIBRATION_BINS = 10
+
+# Per-process backtest data, set once by _init_worker
+_WORKER_DATA: Dict = {}
+
+
+def load_snapshots(path: str) -> List[Dict]:
+    """Load stored list_markets() snapshots from a file or directory
+
+    Each JSON file is either the raw list_markets() response or
+    {"captured_at": "...", "markets": [...]}. captured_at is parsed to a
+    UTC datetime (falling back to the file's modification time) and
+    snapshots are returned in that order.
+    """
+    files = sorted(glob.glob(os.path.join(path, '*.json'))) if os.path.isdir(path) else [path]
+    snapshots = []
+    for fname in files:
+        with open(fname) as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            data = {'markets': data}
+        captured_at = _parse_timestamp(data.get('captured_at'))
+        if captured_at is None:
+            captured_at = datetime.fromtimestamp(os.path.getmtime(fname), timezone.utc)
+        data['captured_at'] = captured_at
+        snapshots.append(data)
+    snapshots.sort(key=lambda s: s['captured_at'])
+    return snapshots
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Parse an ISO timestamp (naive values are taken as UTC), None if invalid"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def load_outcomes(path: str) -> Dict:
+    """Load resolved outcomes
+
+    Format: {market_slug: 1/0} for binary markets, or
+    {market_slug: {outcome_question: 1/0}} for multi-outcome markets.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_strategy(spec: str) -> Callable:
+    """Resolve a "module:function" spec to a strategy callable"""
+    module_name, _, func_name = spec.partition(':')
+    if not func_name:
+        raise ValueError(f"Strategy must be 'module:function', got {spec!r}")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def validate_params(strategy: Callable, param_sets: List[Dict]):
+    """Raise ValueError if any parameter set doesn't fit the strategy's signature"""
+    sig = inspect.signature(strategy)
+    if any(p.kind == p.VAR_KEYWORD for p in sig.parameters.values()):
+        return
+    # First argument is markets; features is supplied by the backtester
+    accepted = set(list(sig.parameters)[1:]) - {'features'}
+    for params in param_sets:
+        unknown = sorted(set(params) - accepted - {'name'})
+        if unknown:
+            label = params.get('name') or json.dumps(params, sort_keys=True)
+            raise ValueError(
+                f"{strategy.__name__}() does not accept {', '.join(unknown)} "
+                f"(parameter set {label}); accepted: {', '.join(sorted(accepted)) or 'none'}"
+            )
+
+
+def market_baseline(markets: List[Dict], shrink: float = 0.0,
+                    confidence: float = 0.5, stake: int = 10,
+                    features: Optional[Dict] = None) -> List[Dict]:
+    """Reference strategy: forecast the market's own yesPrice
+
+    shrink pulls each price toward 0.5 (0 = copy market, 1 = always 0.5).
+    Useful as a baseline to compare real strategies against.
+    """
+    forecasts = []
+    for m in markets:
+        for o in m.get('polymarket_outcomes', []):
+            price = o.get('yesPrice')
+            if price is None:
+                continue
+            forecasts.append({
+                'market_slug': m['slug'],
+                'market_name': m.get('title', m['slug']),
+                'outcome': o.get('question'),
+                'p_yes': (1 - shrink) * float(price) + shrink * 0.5,
+                'confidence': confidence,
+                'rationale': (features or {}).get((m['slug'], o.get('question')), {})
+                             .get('rationale_text') or 'Market baseline',
+                'stake': stake
+            })
+    return forecasts
+
+
+def _resolved_value(outcomes: Dict, market_slug: str, outcome: Optional[str]):
+    """Look up the resolved 1/0 value for a forecast, None if unresolved"""
+    resolved = outcomes.get(market_slug)
+    if isinstance(resolved, dict):
+        resolved = resolved.get(outcome)
+    return None if resolved is None else float(resolved)
+
+
+def _market_price(market: Optional[Dict], outcome: Optional[str]) -> float:
+    """yesPrice of the forecast outcome at snapshot time (NaN if unknown)"""
+    if not market:
+        return float('nan')
+    outcomes = market.get('polymarket_outcomes', [])
+    for o in outcomes:
+        if o.get('question') == outcome and o.get('yesPrice') is not None:
+            return float(o['yesPrice'])
+    if len(outcomes) == 1 and outcomes[0].get('yesPrice') is not None:
+        return float(outcomes[0]['yesPrice'])
+    return float('nan')
+
+
+def _accepts_features(strategy: Callable) -> bool:
+    return 'features' in inspect.signature(strategy).parameters
+
+
+def attach_features(snapshots: List[Dict], cache_dir: Optional[str] = None) -> List[Dict]:
+    """Copy snapshots with FeatureStore features for each one attached
+
+    Computed once up front (and reused from cache_dir across runs) so
+    parameter sets and workers don't recompute them.
+    """
+    store = FeatureStore(cache_dir)
+    attached = []
+    previous = None
+    for snap in snapshots:
+        features = store.get_many(snap['markets'], now=snap['captured_at'],
+                                  previous=previous, live=False)
+        attached.append(dict(snap, features=features))
+        previous = snap['markets']
+    return attached
+
+
+def collect_forecasts(strategy: Callable, snapshots: List[Dict],
+                      outcomes: Dict, params: Optional[Dict] = None) -> Dict:
+    """Run strategy over every snapshot and stack resolved forecasts into arrays
+
+    Unresolved forecasts are counted as skipped; forecasts whose p_yes is
+    missing or not a finite number are counted as invalid.
+    """
+    params = params or {}
+    pass_features = _accepts_features(strategy)
+    rows = []
+    skipped = 0
+    invalid = 0
+    for snap in snapshots:
+        by_slug = {m.get('slug'): m for m in snap['markets']}
+        extra = {'features': snap.get('features')} if pass_features else {}
+        for fc in strategy(snap['markets'], **params, **extra):
+            y = _resolved_value(outcomes, fc['market_slug'], fc.get('outcome'))
+            if y is None:
+                skipped += 1
+                continue
+            try:
+                p_yes = float(fc.get('p_yes'))
+            except (TypeError, ValueError):
+                p_yes = float('nan')
+            if not np.isfinite(p_yes):
+                invalid += 1
+                continue
+            price = _market_price(by_slug.get(fc['market_slug']), fc.get('outcome'))
+            rows.append((p_yes, fc.get('confidence', 0.0),
+                         fc.get('stake', 10), price, y))
+
+    arr = np.array(rows, dtype=float).reshape(-1, 5)
+    return {
+        'p_yes': arr[:, 0],
+        'confidence': arr[:, 1],
+        'stake': arr[:, 2],
+        'price': arr[:, 3],
+        'y': arr[:, 4],
+        'skipped': skipped,
+        'invalid': invalid
+    }
+
+
+def score(batch: Dict, bins: int = CALIBRATION_BINS) -> Dict:
+    """Score stacked forecasts: Brier, stake-weighted return, calibration
+
+    Return assumes each forecast buys YES at the snapshot price when
+    p_yes > price and NO otherwise; forecasts without a price earn 0.
+    """
+    p = np.clip(batch['p_yes'], 0.0, 1.0)
+    y = batch['y']
+    stake = batch['stake']
+    price = batch['price']
+    n = len(p)
+
+    if n == 0:
+        return {'n': 0, 'skipped': batch['skipped'],
+                'invalid': batch.get('invalid', 0), 'brier': None,
+                'stake_weighted_brier': None, 'market_brier': None,
+                'stake_weighted_return': None, 'total_pnl': 0.0,
+                'ece': None, 'calibration': []}
+
+    sq_err = (p - y) ** 2
+    total_stake = stake.sum()
+
+    # PnL per unit staked on the side the forecast disagrees with the market
+    has_price = ~np.isnan(price)
+    q = np.clip(np.where(has_price, price, 0.5), 1e-6, 1 - 1e-6)
+    long_yes = p > q
+    unit_ret = np.where(long_yes, (y - q) / q, (q - y) / (1 - q))
+    unit_ret = np.where(has_price & (p != q), unit_ret, 0.0)
+    pnl = stake * unit_ret
+
+    # Reliability diagram over equal-width bins
+    idx = np.minimum((p * bins).astype(int), bins - 1)
+    counts = np.bincount(idx, minlength=bins)
+    sum_p = np.bincount(idx, weights=p, minlength=bins)
+    sum_y = np.bincount(idx, weights=y, minlength=bins)
+    nonzero = counts > 0
+    mean_p = np.divide(sum_p, counts, out=np.zeros(bins), where=nonzero)
+    mean_y = np.divide(sum_y, counts, out=np.zeros(bins), where=nonzero)
+    ece = float(np.sum(counts * np.abs(mean_p - mean_y)) / n)
+
+    calibration = [
+        {'bin': f"{round(i / bins, 4):g}-{round((i + 1) / bins, 4):g}",
+         'count': int(counts[i]),
+         'mean_p_yes': round(float(mean_p[i]), 4),
+         'observed_rate': round(float(mean_y[i]), 4)}
+        for i in np.flatnonzero(nonzero)
+    ]
+
+    return {
+        'n': n,
+        'skipped': batch['skipped'],
+        'invalid': batch.get('invalid', 0),
+        'brier': float(sq_err.mean()),
+        'stake_weighted_brier': float((stake * sq_err).sum() / total_stake) if total_stake else None,
+        'market_brier': float(((price[has_price] - y[has_price]) ** 2).mean()) if has_price.any() else None,
+        'stake_weighted_return': float(pnl.sum() / total_stake) if total_stake else None,
+        'total_pnl': float(pnl.sum()),
+        'ece': ece,
+        'calibration': calibration
+    }
+
+
+def run_backtest(strategy_spec: str, snapshots: List[Dict], outcomes: Dict,
+                 params: Optional[Dict] = None) -> Dict:
+    """Backtest one strategy/parameter set (picklable for worker processes)"""
+    params = dict(params or {})
+    name = params.pop('name', None) or json.dumps(params, sort_keys=True)
+    strategy = load_strategy(strategy_spec)
+    result = score(collect_forecasts(strategy, snapshots, outcomes, params))
+    result['name'] = name
+    result['params'] = params
+    return result
+
+
+def _init_worker(strategy_spec: str, snapshots: List[Dict], outcomes: Dict):
+    """Receive the shared backtest data once per worker process"""
+    _WORKER_DATA.update(strategy_spec=strategy_spec, snapshots=snapshots, outcomes=outcomes)
+
+
+def _run_worker(params: Dict) -> Dict:
+    return run_backtest(params=params, **_WORKER_DATA)
+
+
+def run_backtests(strategy_spec: str, snapshots: List[Dict], outcomes: Dict,
+                  param_sets: Optional[List[Dict]] = None,
+                  workers: Optional[int] = None,
+                  feature_cache: Optional[str] = None) -> List[Dict]:
+    """Backtest every parameter set, in parallel across cores when >1"""
+    param_sets = param_sets or [{}]
+    strategy = load_strategy(strategy_spec)
+    validate_params(strategy, param_sets)
+    if _accepts_features(strategy):
+        snapshots = attach_features(snapshots, feature_cache)
+    if len(param_sets) == 1 or workers == 1:
+        return [run_backtest(strategy_spec, snapshots, outcomes, p) for p in param_sets]
+
+    # Snapshots and outcomes are sent to each worker once, not per parameter set
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(strategy_spec, snapshots, outcomes)) as pool:
+        return list(pool.map(_run_worker, param_sets))
+
+
+def print_backtest_report(results: List[Dict]):
+    """Pretty print backtest results, best Brier first"""
+    print('\n' + '='*70)
+    print('🧪 BACKTEST REPORT')
+    print('='*70)
+
+    ranked = sorted(results, key=lambda r: (r['brier'] is None, r['brier'] or 0))
+    for i, r in enumerate(ranked, 1):
+        print(f"\n{i}. {r['name']}")
+        if not r['n']:
+            print(f"   ⚠️ No resolved forecasts ({r['skipped']} unresolved, {r['invalid']} invalid)")
+            continue
+        market = f"{r['market_brier']:.4f}" if r['market_brier'] is not None else 'N/A'
+        ret = f"{r['stake_weighted_return']*100:+.1f}%" if r['stake_weighted_return'] is not None else 'N/A'
+        print(f"   📊 Brier: {r['brier']:.4f} | Market Brier: {market} | ECE: {r['ece']:.4f}")
+        print(f"   💰 Return: {ret} | PnL: {r['total_pnl']:+.2f} units")
+        print(f"   📋 Forecasts: {r['n']} resolved, {r['skipped']} unresolved, {r['invalid']} invalid")
+        for b in r['calibration']:
+            print(f"      {b['bin']}: p̄={b['mean_p_yes']:.2f} obs={b['observed_rate']:.2f} (n={b['count']})")
+
+    print('\n' + '='*70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest forecast strategies offline")
+    parser.add_argument('--snapshots', required=True,
+                        help="Snapshot JSON file or directory of list_markets() dumps")
+    parser.add_argument('--outcomes', required=True,
+                        help="JSON file of resolved outcomes")
+    parser.add_argument('--strategy', default=DEFAULT_STRATEGY,
+                        help=f"Strategy as module:function (default: {DEFAULT_STRATEGY})")
+    parser.add_argument('--params',
+                        help="JSON file with a list of parameter sets to sweep")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: all cores)")
+    parser.add_argument('--feature-cache',
+                        help="Directory to persist snapshot features across runs (default: memory only)")
+    parser.add_argument('--output', help="Write results JSON here")
+    args = parser.parse_args()
+
+    snapshots = load_snapshots(args.snapshots)
+    outcomes = load_outcomes(args.outcomes)
+    param_sets = None
+    if args.params:
+        with open(args.params) as f:
+            param_sets = json.load(f)
+
+    print(f"📂 Loaded {len(snapshots)} snapshots, {len(outcomes)} resolved markets")
+    try:
+        results = run_backtests(args.strategy, snapshots, outcomes, param_sets,
+                                args.workers, args.feature_cache)
+    except ValueError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    print_backtest_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
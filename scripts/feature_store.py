@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Oracle ClawBot - Feature Store
+Memoized per-market forecast inputs keyed by (market slug, outcome,
+snapshot version) with an in-memory LRU tier and an on-disk JSON tier
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = ".feature_cache"
+INDEX_FILE = "index.json"
+OPEN_STATUSES = ("open",)
+RESOLUTION_FIELDS = ("end_date", "endDate", "close_time", "resolution_date")
+MARKET_LIMIT = 100  # list_markets() page size; a full page may not be the whole listing
+
+
+def snapshot_version(market: Dict) -> str:
+    """Content hash of a list_markets() entry; changes whenever its data does"""
+    body = json.dumps(market, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(body.encode()).hexdigest()[:16]
+
+
+def market_outcomes(market: Dict) -> List[Optional[str]]:
+    """Outcome questions of a market ([None] for plain binary markets)"""
+    questions = [o.get('question') for o in market.get('polymarket_outcomes', [])]
+    return questions or [None]
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Parse an ISO timestamp (naive values are taken as UTC), None if invalid"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def compute_features(market: Dict, outcome: Optional[str]) -> Dict:
+    """Default snapshot features for one market outcome
+
+    Only depends on the market's own data, so it is safe to memoize under
+    the snapshot version. Time- and history-dependent values are added at
+    read time by derive_features().
+    """
+    prices = {o.get('question'): o.get('yesPrice')
+              for o in market.get('polymarket_outcomes', [])}
+    if outcome is None and len(prices) == 1:
+        outcome = next(iter(prices))
+    yes_price = prices.get(outcome)
+
+    others = [p for q, p in prices.items() if q != outcome and p is not None]
+    spread = None
+    if yes_price is not None and others:
+        spread = round(float(yes_price) - max(float(p) for p in others), 4)
+
+    resolves_at = None
+    for field in RESOLUTION_FIELDS:
+        parsed = _parse_timestamp(market.get(field))
+        if parsed is not None:
+            resolves_at = parsed.isoformat()
+            break
+
+    return {
+        'yes_price': None if yes_price is None else float(yes_price),
+        'outcome_spread': spread,
+        'n_outcomes': len(prices),
+        'resolves_at': resolves_at
+    }
+
+
+def derive_features(base: Dict, previous: Optional[Dict], now: datetime) -> Dict:
+    """Add price delta, time to resolution and rationale text to base features
+
+    previous is the base feature dict of the same (slug, outcome) in the
+    prior snapshot; now is the reference time (snapshot time for replays).
+    """
+    yes_price = base.get('yes_price')
+    delta = None
+    if yes_price is not None and previous and previous.get('yes_price') is not None:
+        delta = round(yes_price - previous['yes_price'], 4)
+
+    hours = None
+    resolves_at = _parse_timestamp(base.get('resolves_at'))
+    if resolves_at is not None:
+        hours = round((resolves_at - now).total_seconds() / 3600, 2)
+
+    parts = []
+    if yes_price is not None:
+        parts.append(f"Market at {yes_price:.0%}")
+        if delta:
+            parts.append(f"{delta:+.0%} since last snapshot")
+    if base.get('outcome_spread') is not None:
+        parts.append(f"{base['outcome_spread']:+.0%} vs next outcome")
+    # Past end_date but still listed while resolution is pending
+    if hours is not None and hours > 0:
+        parts.append(f"{hours:.0f}h to resolution")
+
+    return dict(base,
+                price_delta=delta,
+                hours_to_resolution=hours,
+                rationale_text=", ".join(parts) + "." if parts else "")
+
+
+class FeatureStore:
+    """Two-tier feature cache
+
+    Snapshot features are only recomputed when a market's list_markets()
+    data changes (new snapshot version). Memory is an LRU capped by item
+    count; disk is capped by total bytes (least recently used first).
+
+    Live lookups keep only the current and previous version per outcome
+    and, given a complete open listing, drop markets that have closed.
+    Replays (live=False) read and fill the cache but never touch that
+    live state.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 max_memory_items: int = 4096,
+                 max_disk_bytes: int = 64 * 1024 * 1024,
+                 compute: Callable = compute_features):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.compute = compute
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'computed': 0, 'evicted': 0}
+
+        self._memory: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._index: Dict[str, Dict] = {}          # filename -> entry metadata
+        self._versions: Dict[str, List[str]] = {}  # "slug|outcome" -> [previous, current]
+        self._dirty = False
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._load_index()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, market: Dict, outcome: Optional[str] = None, **kwargs) -> Dict:
+        """Features for one market outcome (see get_many for kwargs)"""
+        result = self.get_many([market], outcomes={market['slug']: [outcome]}, **kwargs)
+        return result[(market['slug'], outcome)]
+
+    def get_many(self, markets: List[Dict],
+                 outcomes: Optional[Dict[str, List[Optional[str]]]] = None,
+                 now: Optional[datetime] = None,
+                 previous: Optional[List[Dict]] = None,
+                 live: bool = True,
+                 complete: bool = False
+                 ) -> Dict[Tuple[str, Optional[str]], Dict]:
+        """Features for every outcome of every market, keyed by (slug, outcome)
+
+        outcomes  restricts which outcomes are looked up per slug
+        now       reference time for hours_to_resolution (default: current time)
+        previous  prior snapshot's markets for price_delta; when omitted on a
+                  live lookup the previous live version is used
+        live      False for replays of stored snapshots
+        complete  markets is the full open listing (not a page cut off by a
+                  limit); live-tracked markets missing from it are evicted
+                  as closed (live only)
+
+        The disk index is written once per call.
+        """
+        now = now or datetime.now(timezone.utc)
+        prev_by_slug = {m['slug']: m for m in previous or []}
+
+        results = {}
+        closed = []
+        for market in markets:
+            slug = market['slug']
+            version = snapshot_version(market)
+            is_open = market.get('status', 'open') in OPEN_STATUSES
+            if not is_open:
+                closed.append(slug)
+            prev_market = prev_by_slug.get(slug)
+            prev_version = snapshot_version(prev_market) if prev_market else None
+
+            wanted = (outcomes or {}).get(slug) or market_outcomes(market)
+            for outcome in wanted:
+                key = (slug, outcome, version)
+                base = self._base(market, key, cache=is_open)
+
+                prev_base = None
+                if prev_market is not None:
+                    prev_base = self._base(prev_market, (slug, outcome, prev_version), cache=is_open)
+                elif live and is_open:
+                    prev_base = self._advance(key)
+
+                results[(slug, outcome)] = derive_features(base, prev_base, now)
+
+        if live:
+            if closed:
+                self.evict_markets(closed)
+            if complete:
+                self.evict_missing(m['slug'] for m in markets)
+        self._enforce_disk_limit()
+        self.flush()
+        return results
+
+    def evict_closed(self, markets: List[Dict]) -> int:
+        """Drop cached features for markets whose status is no longer open"""
+        return self.evict_markets([m['slug'] for m in markets
+                                   if m.get('status', 'open') not in OPEN_STATUSES])
+
+    def evict_missing(self, open_slugs: Iterable[str]) -> int:
+        """Drop live-tracked markets absent from a complete list of open slugs
+
+        Only versions recorded by live lookups are considered; entries
+        written by replays are left to the disk size cap.
+        """
+        open_slugs = set(open_slugs)
+        removed = 0
+        for chain_key in [k for k in self._versions if k.split('|', 1)[0] not in open_slugs]:
+            slug, outcome = chain_key.split('|', 1)
+            for version in self._versions.pop(chain_key):
+                self._drop((slug, outcome or None, version))
+                removed += 1
+            self._dirty = True
+        self.stats['evicted'] += removed
+        return removed
+
+    def evict_markets(self, slugs: Iterable[str]) -> int:
+        """Drop every cached version of the given markets from both tiers"""
+        slugs = set(slugs)
+        keys = {k for k in self._memory if k[0] in slugs}
+        keys |= {(e['slug'], e['outcome'], e['version'])
+                 for e in self._index.values() if e['slug'] in slugs}
+        for key in keys:
+            self._drop(key)
+        for chain_key in [k for k in self._versions if k.split('|', 1)[0] in slugs]:
+            del self._versions[chain_key]
+            self._dirty = True
+        self.stats['evicted'] += len(keys)
+        return len(keys)
+
+    def clear(self):
+        """Empty both tiers"""
+        self._memory.clear()
+        for fname in list(self._index):
+            self._remove_file(fname)
+        self._versions.clear()
+        self._dirty = True
+        self.flush()
+
+    def flush(self):
+        """Persist the disk index if it changed"""
+        if not self.cache_dir or not self._dirty:
+            return
+        self._write_json(INDEX_FILE, {'entries': self._index, 'versions': self._versions})
+        self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _base(self, market: Dict, key: Tuple, cache: bool = True) -> Dict:
+        """Memoized snapshot features for key, computing on a miss"""
+        base = self._cached(key)
+        if base is not None:
+            return base
+        base = self.compute(market, key[1])
+        self.stats['computed'] += 1
+        if cache:
+            self._disk_put(key, base)
+            self._memory_put(key, base)
+        return base
+
+    def _cached(self, key: Tuple) -> Optional[Dict]:
+        base = self._memory.get(key)
+        if base is not None:
+            self._memory.move_to_end(key)
+            self._touch(key)
+            self.stats['memory_hits'] += 1
+            return base
+        base = self._disk_get(key)
+        if base is not None:
+            self._memory_put(key, base)
+            self.stats['disk_hits'] += 1
+        return base
+
+    def _advance(self, key: Tuple) -> Optional[Dict]:
+        """Record key as the live version and return the previous one's features
+
+        Versions older than the previous one are dropped from both tiers.
+        """
+        slug, outcome, version = key
+        chain_key = f"{slug}|{outcome or ''}"
+        chain = self._versions.get(chain_key, [])
+        if not chain or chain[-1] != version:
+            for stale in chain[:-1]:
+                if stale != version:
+                    self._drop((slug, outcome, stale))
+                    self.stats['evicted'] += 1
+            chain = chain[-1:] + [version]
+            self._versions[chain_key] = chain
+            self._dirty = True
+        if len(chain) < 2:
+            return None
+        return self._cached((slug, outcome, chain[0]))
+
+    def _memory_put(self, key: Tuple, base: Dict):
+        self._memory[key] = base
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _drop(self, key: Tuple):
+        self._memory.pop(key, None)
+        if self.cache_dir:
+            self._remove_file(self._filename(key))
+
+    @staticmethod
+    def _filename(key: Tuple) -> str:
+        slug, outcome, version = key
+        digest = hashlib.sha256(f"{slug}|{outcome or ''}".encode()).hexdigest()[:16]
+        return f"{digest}-{version}.json"
+
+    def _touch(self, key: Tuple):
+        """Refresh the disk LRU timestamp (memory hits count as disk use too)"""
+        if not self.cache_dir:
+            return
+        entry = self._index.get(self._filename(key))
+        if entry is not None:
+            entry['last_access'] = datetime.now(timezone.utc).timestamp()
+            self._dirty = True
+
+    def _disk_get(self, key: Tuple) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        fname = self._filename(key)
+        if fname not in self._index:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, fname)) as f:
+                base = json.load(f)['features']
+        except (OSError, ValueError, KeyError):
+            self._remove_file(fname)
+            return None
+        self._touch(key)
+        return base
+
+    def _disk_put(self, key: Tuple, base: Dict):
+        if not self.cache_dir:
+            return
+        slug, outcome, version = key
+        fname = self._filename(key)
+        size = self._write_json(fname, {'slug': slug, 'outcome': outcome,
+                                        'version': version, 'features': base})
+        self._index[fname] = {
+            'slug': slug,
+            'outcome': outcome,
+            'version': version,
+            'size': size,
+            'last_access': datetime.now(timezone.utc).timestamp()
+        }
+        self._dirty = True
+
+    def _enforce_disk_limit(self):
+        total = sum(e['size'] for e in self._index.values())
+        if total <= self.max_disk_bytes:
+            return
+        for fname, entry in sorted(self._index.items(), key=lambda kv: kv[1]['last_access']):
+            if total <= self.max_disk_bytes:
+                break
+            total -= entry['size']
+            self._remove_file(fname)
+            self.stats['evicted'] += 1
+
+    def _remove_file(self, fname: str):
+        if self._index.pop(fname, None) is None:
+            return
+        self._dirty = True
+        try:
+            os.remove(os.path.join(self.cache_dir, fname))
+        except OSError:
+            pass
+
+    def _write_json(self, fname: str, data: Dict) -> int:
+        """Atomic write so concurrent readers never see a partial file"""
+        path = os.path.join(self.cache_dir, fname)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, path)
+        return os.path.getsize(path)
+
+    def _load_index(self):
+        path = os.path.join(self.cache_dir, INDEX_FILE)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._index = data.get('entries', {})
+        self._versions = data.get('versions', {})
+
+
+def main():
+    """Warm the feature cache from a live list_markets() call or a snapshot file"""
+    parser = argparse.ArgumentParser(description="Warm the forecast feature cache")
+    parser.add_argument('--snapshot', help="list_markets() JSON dump (default: fetch live)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--clear', action='store_true', help="Empty the cache first")
+    args = parser.parse_args()
+
+    now = None
+    if args.snapshot:
+        with open(args.snapshot) as f:
+            markets = json.load(f)
+        if isinstance(markets, dict):
+            now = _parse_timestamp(markets.get('captured_at'))
+            markets = markets['markets']
+    else:
+        # Imported here so the store itself works without requests installed
+        from oracles_client import OraclesClient
+        agent_id = os.getenv("ORACLES_AGENT_ID")
+        api_key = os.getenv("ORACLES_API_KEY")
+        if not agent_id or not api_key:
+            print("⚠️  Set ORACLES_AGENT_ID and ORACLES_API_KEY env vars or pass --snapshot")
+            sys.exit(1)
+        markets = OraclesClient(agent_id, api_key).list_markets(status="open", limit=MARKET_LIMIT)
+
+    store = FeatureStore(args.cache_dir)
+    if args.clear:
+        store.clear()
+    # A stored snapshot is a replay; a full page may be cut off by the limit
+    live = not args.snapshot
+    features = store.get_many(markets, now=now, live=live,
+                              complete=live and len(markets) < MARKET_LIMIT)
+
+    print(f"✅ {len(features)} feature sets for {len(markets)} markets")
+    print(f"   🧠 Memory hits: {store.stats['memory_hits']} | 💾 Disk hits: {store.stats['disk_hits']}")
+    print(f"   🔄 Computed: {store.stats['computed']} | 🗑️ Evicted: {store.stats['evicted']}")
+
+
+if __name__ == "__main__":
+    main()
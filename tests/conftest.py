@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Scripts import their siblings directly (e.g. `from oracles_client import ...`)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+sys.path.insert(0, ROOT_DIR)
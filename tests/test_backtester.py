@@ -0,0 +1,114 @@
+import os
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+import backtester
+
+
+def _batch(p_yes, y, stake, price):
+    return {
+        'p_yes': np.array(p_yes, dtype=float),
+        'confidence': np.zeros(len(p_yes)),
+        'stake': np.array(stake, dtype=float),
+        'price': np.array(price, dtype=float),
+        'y': np.array(y, dtype=float),
+        'skipped': 0,
+        'invalid': 0
+    }
+
+
+def test_score_known_values():
+    # Long YES at 0.6 that resolves YES, long NO at 0.5 that resolves NO
+    result = backtester.score(_batch([0.8, 0.3], [1, 0], [10, 10], [0.6, 0.5]))
+
+    assert result['n'] == 2
+    assert result['brier'] == pytest.approx((0.04 + 0.09) / 2)
+    assert result['market_brier'] == pytest.approx((0.16 + 0.25) / 2)
+    assert result['total_pnl'] == pytest.approx(10 * 0.4 / 0.6 + 10 * 0.5 / 0.5)
+    assert result['stake_weighted_return'] == pytest.approx(result['total_pnl'] / 20)
+    assert result['ece'] == pytest.approx((0.2 + 0.3) / 2)
+    assert [b['bin'] for b in result['calibration']] == ['0.3-0.4', '0.8-0.9']
+
+
+def test_score_p_one_lands_in_last_bin():
+    result = backtester.score(_batch([1.0], [1], [10], [0.9]))
+    assert result['calibration'] == [
+        {'bin': '0.9-1', 'count': 1, 'mean_p_yes': 1.0, 'observed_rate': 1.0}
+    ]
+
+
+def test_score_bin_labels_for_other_bin_counts():
+    result = backtester.score(_batch([0.01, 0.06], [0, 1], [1, 1], [0.5, 0.5]), bins=20)
+    assert [b['bin'] for b in result['calibration']] == ['0-0.05', '0.05-0.1']
+
+
+def test_score_empty_batch():
+    result = backtester.score(_batch([], [], [], []))
+    assert result['n'] == 0
+    assert result['brier'] is None
+    assert result['ece'] is None
+    assert result['calibration'] == []
+
+
+def test_collect_forecasts_counts_unresolved_and_invalid():
+    market = {'slug': 'pm-a', 'polymarket_outcomes': [{'question': 'Q', 'yesPrice': 0.5}]}
+
+    def strategy(markets):
+        return [
+            {'market_slug': 'pm-a', 'outcome': 'Q', 'p_yes': 0.7},
+            {'market_slug': 'pm-a', 'outcome': 'Q', 'p_yes': None},
+            {'market_slug': 'pm-a', 'outcome': 'Q', 'p_yes': float('nan')},
+            {'market_slug': 'pm-unresolved', 'outcome': 'Q', 'p_yes': 0.4},
+        ]
+
+    batch = backtester.collect_forecasts(strategy, [{'markets': [market]}], {'pm-a': {'Q': 1}})
+    assert batch['p_yes'].tolist() == [0.7]
+    assert batch['skipped'] == 1
+    assert batch['invalid'] == 2
+    assert backtester.score(batch)['n'] == 1
+
+
+def test_load_snapshots_orders_by_captured_at_and_mtime(tmp_path):
+    def write(name, data):
+        path = tmp_path / name
+        path.write_text(json.dumps(data))
+        return path
+
+    write('a.json', {'captured_at': '2026-01-03T00:00:00Z', 'markets': []})
+    no_time = write('b.json', [])
+    write('c.json', {'captured_at': '2026-01-01T00:00:00+00:00', 'markets': []})
+    mtime = datetime(2026, 1, 2, tzinfo=timezone.utc).timestamp()
+    os.utime(no_time, (mtime, mtime))
+
+    snapshots = backtester.load_snapshots(str(tmp_path))
+
+    assert [s['captured_at'].day for s in snapshots] == [1, 2, 3]
+    assert all(s['captured_at'].tzinfo is not None for s in snapshots)
+
+
+def test_validate_params_rejects_unknown_parameter():
+    with pytest.raises(ValueError, match='bogus'):
+        backtester.validate_params(backtester.market_baseline, [{'name': 'x', 'bogus': 1}])
+
+    # name and known keyword arguments are fine
+    backtester.validate_params(backtester.market_baseline, [{'name': 'x', 'shrink': 0.5}])
+
+
+def test_run_backtests_parallel_matches_serial():
+    snapshots = [{
+        'captured_at': datetime(2026, 1, 1, tzinfo=timezone.utc),
+        'markets': [{'slug': 'pm-a', 'status': 'open',
+                     'polymarket_outcomes': [{'question': 'Q', 'yesPrice': 0.6}]}]
+    }]
+    outcomes = {'pm-a': {'Q': 1}}
+    param_sets = [{'name': 'copy'}, {'name': 'shrink', 'shrink': 0.5}]
+    spec = 'backtester:market_baseline'
+
+    serial = backtester.run_backtests(spec, snapshots, outcomes, param_sets, workers=1)
+    parallel = backtester.run_backtests(spec, snapshots, outcomes, param_sets, workers=2)
+
+    assert [r['name'] for r in parallel] == ['copy', 'shrink']
+    assert [r['brier'] for r in parallel] == [r['brier'] for r in serial]
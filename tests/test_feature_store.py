@@ -0,0 +1,139 @@
+import time
+from datetime import datetime, timezone
+
+from feature_store import FeatureStore, derive_features
+
+
+def _market(slug, price, status='open', end_date=None):
+    market = {
+        'slug': slug,
+        'status': status,
+        'polymarket_outcomes': [{'question': 'Q', 'yesPrice': price}]
+    }
+    if end_date:
+        market['end_date'] = end_date
+    return market
+
+
+def _cached_versions(store, slug):
+    return sorted(e['version'] for e in store._index.values() if e['slug'] == slug)
+
+
+def test_hit_or_recompute_depends_on_snapshot_version(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.get_many([_market('pm-a', 0.5)])
+    store.get_many([_market('pm-a', 0.5)])
+    assert store.stats['computed'] == 1
+    assert store.stats['memory_hits'] == 1
+
+    reopened = FeatureStore(str(tmp_path))
+    reopened.get_many([_market('pm-a', 0.5)], live=False)
+    assert reopened.stats['disk_hits'] == 1
+    assert reopened.stats['computed'] == 0
+
+    features = reopened.get_many([_market('pm-a', 0.6)])
+    assert reopened.stats['computed'] == 1
+    assert features[('pm-a', 'Q')]['yes_price'] == 0.6
+    assert features[('pm-a', 'Q')]['price_delta'] == 0.1
+
+
+def test_memory_lru_cap():
+    store = FeatureStore(None, max_memory_items=2)
+    store.get_many([_market('pm-a', 0.1), _market('pm-b', 0.2)])
+    store.get_many([_market('pm-a', 0.1)])   # pm-a is now most recently used
+    store.get_many([_market('pm-c', 0.3)])
+
+    assert len(store._memory) == 2
+    assert {k[0] for k in store._memory} == {'pm-a', 'pm-c'}
+
+
+def test_disk_cap_evicts_least_recently_used_first(tmp_path):
+    store = FeatureStore(str(tmp_path), max_memory_items=10)
+    store.get_many([_market('pm-a', 0.1)])
+    time.sleep(0.01)
+    store.get_many([_market('pm-b', 0.2)])
+    time.sleep(0.01)
+    store.get_many([_market('pm-a', 0.1)])   # memory hit still refreshes disk LRU
+    time.sleep(0.01)
+
+    entry_size = max(e['size'] for e in store._index.values())
+    store.max_disk_bytes = 2 * entry_size
+    store.get_many([_market('pm-c', 0.3)])
+
+    assert sorted(e['slug'] for e in store._index.values()) == ['pm-a', 'pm-c']
+    assert len(list(tmp_path.glob('*-*.json'))) == 2
+
+
+def test_closed_market_is_evicted(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.get_many([_market('pm-a', 0.5)])
+    store.get_many([_market('pm-a', 0.5, status='closed')])
+
+    assert _cached_versions(store, 'pm-a') == []
+    assert not any(k[0] == 'pm-a' for k in store._memory)
+    assert 'pm-a|Q' not in store._versions
+
+
+def test_missing_market_is_evicted_but_replay_entries_are_kept(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.get_many([_market('pm-a', 0.5), _market('pm-b', 0.5)])
+    store.get_many([_market('pm-r', 0.5)], live=False)
+
+    # pm-a is no longer in the complete open listing
+    store.get_many([_market('pm-b', 0.5)], complete=True)
+
+    assert _cached_versions(store, 'pm-a') == []
+    assert len(_cached_versions(store, 'pm-b')) == 1
+    assert len(_cached_versions(store, 'pm-r')) == 1
+
+
+def test_partial_listing_does_not_evict(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.get_many([_market('pm-a', 0.5), _market('pm-b', 0.5)])
+    store.get_many([_market('pm-b', 0.5)])
+
+    assert len(_cached_versions(store, 'pm-a')) == 1
+
+
+def test_version_chain_keeps_previous_and_current(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    for price in (0.5, 0.6, 0.7):
+        features = store.get_many([_market('pm-a', price)])
+
+    assert features[('pm-a', 'Q')]['price_delta'] == 0.1
+    assert len(store._versions['pm-a|Q']) == 2
+    assert _cached_versions(store, 'pm-a') == sorted(store._versions['pm-a|Q'])
+    assert len([k for k in store._memory if k[0] == 'pm-a']) == 2
+
+
+def test_replay_does_not_change_live_versions(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.get_many([_market('pm-a', 0.5)])
+    store.get_many([_market('pm-a', 0.6)])
+    versions = {k: list(v) for k, v in store._versions.items()}
+
+    features = store.get_many([_market('pm-a', 0.3)], previous=[_market('pm-a', 0.2)], live=False)
+    assert features[('pm-a', 'Q')]['price_delta'] == 0.1
+    assert store._versions == versions
+
+    features = store.get_many([_market('pm-a', 0.7)])
+    assert features[('pm-a', 'Q')]['price_delta'] == 0.1
+
+
+def test_hours_to_resolution_uses_reference_time():
+    store = FeatureStore(None)
+    market = _market('pm-a', 0.5, end_date='2026-03-02T00:00:00Z')
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    features = store.get_many([market], now=now, live=False)[('pm-a', 'Q')]
+    assert features['hours_to_resolution'] == 24.0
+    assert features['rationale_text'] == 'Market at 50%, 24h to resolution.'
+
+
+def test_rationale_omits_hours_past_end_date():
+    base = {'yes_price': 0.8, 'outcome_spread': 0.55, 'n_outcomes': 2,
+            'resolves_at': '2026-01-01T00:00:00+00:00'}
+    features = derive_features(base, {'yes_price': 0.7}, datetime(2026, 3, 1, tzinfo=timezone.utc))
+
+    assert features['hours_to_resolution'] < 0
+    assert features['rationale_text'] == 'Market at 80%, +10% since last snapshot, +55% vs next outcome.'